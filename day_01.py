@@ -76,27 +76,156 @@ In this example, there are 5 sums that are larger than the previous sum.
 Consider sums of a three-measurement sliding window. How many sums are larger than the previous sum?
 """
 
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import gt
 from pathlib import Path
-from typing import List
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from utils import iter_chunk_lines, split_on_newlines
 
 INPUT_PATH = Path(__file__).parent / "data/day_01.txt"
 
 
 def solve_puzzle_1(offset: int = 1) -> int:
     with open(INPUT_PATH) as f:
-        lines: List[int] = list(map(int, f.readlines()))
-
-    diffs = []
-    for num, line in enumerate(lines[offset:]):
-        is_increase = line > lines[num]
-        diffs.append(is_increase)
-    return sum(diffs)
+        return count_increases_streaming(f, offset=offset)
 
 
 def solve_puzzle_2(offset: int = 3) -> int:
     return solve_puzzle_1(offset=offset)
 
 
+def iter_increase_counts(
+    depths: Iterable[Union[int, str, bytes]], offset: int = 1
+) -> Iterator[int]:
+    """Yields the running increase count after each comparison.
+
+    Only the last `offset` depths are kept, so `depths` can be a file handle or
+    an unbounded generator.
+    """
+    if offset < 1:
+        raise ValueError(f"offset must be at least 1, got {offset}")
+
+    window = deque(maxlen=offset)
+    count = 0
+    for depth in map(int, depths):
+        if len(window) == offset:
+            count += depth > window[0]
+            yield count
+        window.append(depth)
+
+
+def count_increases_streaming(
+    depths: Iterable[Union[int, str, bytes]], offset: int = 1
+) -> int:
+    count = 0
+    for count in iter_increase_counts(depths, offset):
+        pass
+    return count
+
+
+def load_depths(path: Path = INPUT_PATH) -> array:
+    with open(path, "rb") as f:
+        return array("q", map(int, f.read().split()))
+
+
+def count_increases(
+    depths: Sequence[int], offsets: Iterable[int] = (1, 3)
+) -> Dict[int, int]:
+    """Counts increases for several window offsets over the same depths.
+
+    The depths are packed into a single int array once and every offset is
+    compared with a C-level `map` rather than a Python loop.
+    """
+    if not isinstance(depths, array):
+        depths = array("q", depths)
+
+    counts = {}
+    for offset in offsets:
+        if offset < 1:
+            raise ValueError(f"offset must be at least 1, got {offset}")
+        counts[offset] = sum(map(gt, islice(depths, offset, None), depths))
+    return counts
+
+
+def solve_puzzle_parallel(
+    offset: int = 1, path: Path = INPUT_PATH, workers: Optional[int] = None
+) -> int:
+    """Counts increases on a process pool, one newline-aligned byte range each.
+
+    Every chunk reports its own count plus its first and last `offset` depths,
+    which are used to add the comparisons that straddle chunk boundaries.
+    """
+    if offset < 1:
+        raise ValueError(f"offset must be at least 1, got {offset}")
+
+    workers = workers or os.cpu_count() or 1
+    chunks = split_on_newlines(path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            _count_chunk,
+            [path] * len(chunks),
+            [start for start, _ in chunks],
+            [end for _, end in chunks],
+            [offset] * len(chunks),
+        )
+        return _stitch_chunk_counts(results, offset)
+
+
+def _count_chunk(
+    path: Path, start: int, end: int, offset: int
+) -> Tuple[int, List[int], List[int]]:
+    depths = map(int, iter_chunk_lines(path, start, end))
+    head = list(islice(depths, offset))
+    window = deque(head, maxlen=offset)
+    count = 0
+    for depth in depths:
+        count += depth > window[0]
+        window.append(depth)
+    return count, head, list(window)
+
+
+def _stitch_chunk_counts(
+    results: Iterable[Tuple[int, List[int], List[int]]], offset: int
+) -> int:
+    total = 0
+    previous = deque(maxlen=offset)
+    for count, head, tail in results:
+        joined = list(previous) + head
+        for num in range(max(len(previous), offset), len(joined)):
+            total += joined[num] > joined[num - offset]
+        total += count
+        previous.extend(tail)
+    return total
+
+
+def test_stitch_chunk_counts():
+    for offset in (1, 3, 5):
+        expected = solve_puzzle_1(offset)
+        # Thousands of chunks leave most of them shorter than the offset
+        for n_chunks in (1, 2, 7, 1000, 3000):
+            results = [
+                _count_chunk(INPUT_PATH, start, end, offset)
+                for start, end in split_on_newlines(INPUT_PATH, n_chunks)
+            ]
+            assert _stitch_chunk_counts(results, offset) == expected
+
+
+test_stitch_chunk_counts()
+
 if __name__ == "__main__":
     puzzle_1_answer = solve_puzzle_1()
     print(f"Puzzle 1: {puzzle_1_answer}")
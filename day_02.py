@@ -53,48 +53,97 @@ After following these new instructions, you would have a horizontal position of
 
 Using this new interpretation of the commands, calculate the horizontal position and depth you would have after following the planned course. What do you get if you multiply your final horizontal position by your final depth?
 """
+from __future__ import annotations
 
+import json
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import reduce
+from itertools import accumulate, compress, islice
+from operator import mul, sub
 from pathlib import Path
-from typing import Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from utils import iter_chunk_lines, split_on_newlines
 
 INPUT_PATH = Path(__file__).parent / "data/day_02.txt"
 
+TEST_INPUT = b"""forward 5
+down 5
+forward 8
+up 3
+down 8
+forward 2
+"""
+
 
-def solve_puzzle_1() -> int:
-    horizontal_position = 0
-    depth = 0
-    with open(INPUT_PATH) as f:
-        moves = map(lambda x: x.split(), f.readlines())
+FORWARD, UP, DOWN = 0, 1, 2
 
-    for move in moves:
-        if move[0] == "forward":
-            horizontal_position += int(move[1])
-        elif move[0] == "up":
-            depth -= int(move[1])
-        elif move[0] == "down":
-            depth += int(move[1])
-    return horizontal_position * depth
+# Each command word holds exactly one of these letters, and the others hold none
+_CODE_LETTERS = b"fun"
+_CODE_TABLE = bytes.maketrans(_CODE_LETTERS, bytes([FORWARD, UP, DOWN]))
+_NON_CODE_BYTES = bytes(set(range(256)) - set(_CODE_LETTERS))
+_COMMAND_BYTES = b"forwardupn \r"
 
+# Map command codes to 1 where a command is selected and 0 elsewhere
+_FORWARD_SELECTOR = bytes.maketrans(bytes([FORWARD, UP, DOWN]), bytes([1, 0, 0]))
+_AIM_SELECTOR = bytes.maketrans(bytes([FORWARD, UP, DOWN]), bytes([0, 1, 1]))
 
-def solve_puzzle_2() -> int:
-    aim = 0
-    horizontal_position = 0
-    depth = 0
-    with open(INPUT_PATH) as f:
-        moves = map(lambda x: x.split(), f.readlines())
-
-    for move in moves:
-        if move[0] == "forward":
-            horizontal_position, depth = apply_forward(
-                int(move[1]), aim, horizontal_position, depth
-            )
-        elif move[0] == "up":
-            aim = apply_up(int(move[1]), aim)
-        elif move[0] == "down":
-            aim = apply_down(int(move[1]), aim)
+
+def solve_puzzle_1(path: Path = INPUT_PATH) -> int:
+    codes, values = parse_commands(path)
+    horizontal_position = sum(compress(values, codes.translate(_FORWARD_SELECTOR)))
+    depth = sum(compress(values, codes.translate(_AIM_SELECTOR)))
     return horizontal_position * depth
 
 
+def solve_puzzle_2(path: Path = INPUT_PATH) -> int:
+    course = CourseSummary.from_commands(*parse_commands(path))
+    return course.horizontal * course.depth
+
+
+def solve_puzzles(path: Path = INPUT_PATH) -> Tuple[int, int]:
+    """Returns both puzzle answers from a single parse"""
+    course = CourseSummary.from_commands(*parse_commands(path))
+    # Without aim, "up" and "down" move the depth directly, which is the aim
+    return course.horizontal * course.aim, course.horizontal * course.depth
+
+
+def parse_commands(path: Path = INPUT_PATH) -> Tuple[bytes, array]:
+    """Returns command codes and signed magnitudes, in that order"""
+    with open(path, "rb") as f:
+        return parse_command_bytes(f.read())
+
+
+def parse_command_bytes(data: bytes) -> Tuple[bytes, array]:
+    """Decodes commands with bulk bytes operations, never splitting into tokens.
+
+    Deleting every byte but the code letters leaves one code byte per command.
+    Deleting the command words, after turning "up " into a minus sign, leaves
+    one signed magnitude per line, which a single `json.loads` decodes. Anything
+    JSON rejects, such as leading zeros, falls back to `int` on every line.
+    """
+    codes = data.translate(_CODE_TABLE, _NON_CODE_BYTES)
+    numbers = data.replace(b"up ", b"-").translate(None, _COMMAND_BYTES).strip()
+    try:
+        values = array("q", json.loads(b"[" + numbers.replace(b"\n", b",") + b"]"))
+    except (ValueError, TypeError):
+        values = array("q", map(int, numbers.split()))
+    if len(codes) != len(values):
+        raise ValueError("every command needs exactly one magnitude")
+    return codes, values
+
+
+def _forward_amounts(codes: bytes, values: array) -> Iterator[int]:
+    return map(mul, values, codes.translate(_FORWARD_SELECTOR))
+
+
+def _aim_deltas(codes: bytes, values: array) -> Iterator[int]:
+    return map(mul, values, codes.translate(_AIM_SELECTOR))
+
+
 def apply_down(down: int, aim: int) -> int:
     aim += down
     return aim
@@ -113,9 +162,174 @@ def apply_forward(
     return horizontal_position, depth
 
 
+class CourseIndex:
+    """Cumulative aim, horizontal position and depth after every step of a course.
+
+    Step 0 is the starting position and step k is the state after the first k
+    commands, so point queries are O(1). Range maxima of the depth use a sparse
+    table that is built on the first range query.
+    """
+
+    def __init__(self, forwards: Iterable[int], aim_deltas: Iterable[int]) -> None:
+        forwards = array("q", forwards)
+        self.aims = array("q", accumulate(aim_deltas, initial=0))
+        self.horizontals = array("q", accumulate(forwards, initial=0))
+        self.depths = array(
+            "q", accumulate(map(mul, forwards, self.aims[1:]), initial=0)
+        )
+        self._depth_table: Optional[List[array]] = None
+
+    @classmethod
+    def from_commands(cls, codes: bytes, values: array) -> CourseIndex:
+        return cls(_forward_amounts(codes, values), _aim_deltas(codes, values))
+
+    def __len__(self) -> int:
+        """Number of commands in the course"""
+        return len(self.aims) - 1
+
+    def aim(self, step: int) -> int:
+        return self.aims[step]
+
+    def horizontal_position(self, step: int) -> int:
+        return self.horizontals[step]
+
+    def depth(self, step: int) -> int:
+        return self.depths[step]
+
+    def position(self, step: int) -> Tuple[int, int]:
+        """Returns horizontal position and depth, in that order"""
+        return self.horizontals[step], self.depths[step]
+
+    def max_depth(self, start: int, stop: int) -> int:
+        """Maximum depth over steps start to stop, both inclusive"""
+        if not 0 <= start <= stop <= len(self):
+            raise IndexError(f"invalid step range {start}..{stop}")
+
+        if self._depth_table is None:
+            self._depth_table = self._build_depth_table()
+        level = (stop - start + 1).bit_length() - 1
+        row = self._depth_table[level]
+        return max(row[start], row[stop - (1 << level) + 1])
+
+    def _build_depth_table(self) -> List[array]:
+        table = [self.depths]
+        span = 1
+        while span * 2 <= len(self.depths):
+            previous = table[-1]
+            table.append(array("q", map(max, previous, previous[span:])))
+            span *= 2
+        return table
+
+
+@dataclass(frozen=True)
+class CourseSummary:
+    """Net effect of a run of commands on a submarine starting with zero aim.
+
+    Starting from aim `a`, the run adds `horizontal * a` on top of `depth`, so
+    summaries of consecutive runs combine associatively.
+    """
+
+    horizontal: int = 0
+    aim: int = 0
+    depth: int = 0
+
+    def combine(self, other: CourseSummary) -> CourseSummary:
+        return CourseSummary(
+            self.horizontal + other.horizontal,
+            self.aim + other.aim,
+            self.depth + other.depth + self.aim * other.horizontal,
+        )
+
+    @classmethod
+    def from_commands(cls, codes: bytes, values: array) -> CourseSummary:
+        forward_selectors = codes.translate(_FORWARD_SELECTOR)
+        forwards = list(compress(values, forward_selectors))
+        aim = sum(compress(values, codes.translate(_AIM_SELECTOR)))
+        # The running sum of all values at a forward, minus the forwards so far,
+        # is the aim at that forward
+        aims = map(
+            sub,
+            compress(accumulate(values), forward_selectors),
+            accumulate(forwards),
+        )
+        depth = sum(map(mul, forwards, aims))
+        return cls(sum(forwards), aim, depth)
+
+
+def solve_puzzles_parallel(
+    path: Path = INPUT_PATH, workers: Optional[int] = None
+) -> Tuple[int, int]:
+    """Returns both puzzle answers, summarising file chunks on a process pool"""
+    workers = workers or os.cpu_count() or 1
+    chunks = split_on_newlines(path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        summaries = executor.map(
+            _summarise_chunk,
+            [path] * len(chunks),
+            [start for start, _ in chunks],
+            [end for _, end in chunks],
+        )
+        course = reduce(CourseSummary.combine, summaries, CourseSummary())
+    # Without aim, "up" and "down" move the depth directly, which is the aim
+    return course.horizontal * course.aim, course.horizontal * course.depth
+
+
+def _summarise_chunk(
+    path: Path, start: int, end: int, batch_size: int = 1 << 16
+) -> CourseSummary:
+    lines = iter_chunk_lines(path, start, end)
+    summary = CourseSummary()
+    while True:
+        batch = b"".join(islice(lines, batch_size))
+        if not batch:
+            return summary
+        summary = summary.combine(
+            CourseSummary.from_commands(*parse_command_bytes(batch))
+        )
+
+
+def test_course_index():
+    course = CourseIndex.from_commands(*parse_command_bytes(TEST_INPUT))
+    assert len(course) == 6
+    assert course.position(6) == (15, 60)
+    assert course.aim(6) == 10
+    for start in range(len(course) + 1):
+        for stop in range(start, len(course) + 1):
+            expected = max(course.depth(step) for step in range(start, stop + 1))
+            assert course.max_depth(start, stop) == expected
+
+
+def test_course_summary():
+    lines = TEST_INPUT.splitlines(keepends=True)
+    for split in range(len(lines) + 1):
+        first = CourseSummary.from_commands(
+            *parse_command_bytes(b"".join(lines[:split]))
+        )
+        second = CourseSummary.from_commands(
+            *parse_command_bytes(b"".join(lines[split:]))
+        )
+        course = first.combine(second)
+        assert course.horizontal * course.aim == 150
+        assert course.horizontal * course.depth == 900
+
+
+def test_parse_command_bytes():
+    codes, values = parse_command_bytes(b"forward 05\nup 007\ndown 1\n")
+    assert list(codes) == [FORWARD, UP, DOWN]
+    assert list(values) == [5, -7, 1]
+    try:
+        parse_command_bytes(b"forward 5.5\n")
+    except ValueError as error:
+        assert "5.5" in str(error)
+    else:
+        raise AssertionError("accepted a fractional magnitude")
+
+
+test_course_index()
+test_course_summary()
+test_parse_command_bytes()
+
 if __name__ == "__main__":
-    answer = solve_puzzle_1()
+    answer, second_answer = solve_puzzles()
     print(f"Puzzle 1: {answer}")
-
-    answer = solve_puzzle_2()
-    print(f"Puzzle 2: {answer}")
+    print(f"Puzzle 2: {second_answer}")
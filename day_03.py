@@ -63,9 +63,13 @@ Finally, to find the life support rating, multiply the oxygen generator rating (
 Use the binary numbers in your diagnostic report to calculate the oxygen generator rating and CO2 scrubber rating, then multiply them together. What is the life support rating of the submarine? (Be sure to represent your answer in decimal, not binary.)
 """
 
+from __future__ import annotations
+
+from bisect import bisect_left
 from collections import Counter
+from itertools import islice
 from pathlib import Path
-from typing import List, Literal
+from typing import AnyStr, Iterable, List, Literal, Optional, Sequence, Tuple
 
 INPUT_PATH = Path(__file__).parent / "data/day_03.txt"
 
@@ -136,8 +140,183 @@ def determine_most_common(counts: Counter) -> Literal["0", "1"]:
         return "1"
 
 
+class DiagnosticReport:
+    """A report packed into one row-major byte matrix of ASCII bits.
+
+    Column `c` of the matrix is the slice `bits[c::width]`, so counting the
+    ones in a column is a single C-level `count` regardless of report width.
+    """
+
+    def __init__(self, bits: bytes, width: int) -> None:
+        if width < 1 or len(bits) % width:
+            raise ValueError(f"{len(bits)} bits do not split into rows of {width}")
+        self.bits = bits
+        self.width = width
+        self.num_rows = len(bits) // width
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[AnyStr]) -> DiagnosticReport:
+        rows = [row.strip() for row in rows]
+        rows = [row.encode() if isinstance(row, str) else row for row in rows if row]
+        width = len(rows[0]) if rows else 1
+        if any(len(row) != width for row in rows):
+            raise ValueError("all rows of a report must have the same width")
+        return cls(b"".join(rows), width)
+
+    @classmethod
+    def from_path(cls, path: Path = INPUT_PATH) -> DiagnosticReport:
+        with open(path, "rb") as f:
+            return cls.from_rows(f.read().split())
+
+    def column_ones(self) -> List[int]:
+        return _count_column_ones(self.bits, self.width)
+
+    def rates(self) -> Tuple[int, int]:
+        """Returns gamma and epsilon rates, in that order"""
+        return _rates_from_counts(self.column_ones(), self.num_rows)
+
+    def power_consumption(self) -> int:
+        gamma_rate, epsilon_rate = self.rates()
+        return gamma_rate * epsilon_rate
+
+
+class BitCountAccumulator:
+    """Running per-column counts of ones for rows that arrive incrementally.
+
+    Only `width` counters are kept, and accumulators filled from separate
+    sources can be merged.
+    """
+
+    def __init__(self, width: Optional[int] = None) -> None:
+        self.width = width
+        self.ones = [0] * width if width else []
+        self.num_rows = 0
+
+    def add(self, row: AnyStr) -> None:
+        self.update([row])
+
+    def update(self, rows: Iterable[AnyStr], batch_size: int = 1 << 16) -> None:
+        rows = iter(rows)
+        while True:
+            batch = [row.strip() for row in islice(rows, batch_size)]
+            if not batch:
+                return
+            batch = [row for row in batch if row]
+            if not batch:
+                continue
+
+            self._set_width(len(batch[0]))
+            if any(len(row) != self.width for row in batch):
+                raise ValueError(f"all rows must have width {self.width}")
+            bits = batch[0][:0].join(batch)
+            counts = _count_column_ones(bits, self.width)
+            self.ones = [total + count for total, count in zip(self.ones, counts)]
+            self.num_rows += len(batch)
+
+    def merge(self, other: BitCountAccumulator) -> None:
+        if other.width is None:
+            return
+        self._set_width(other.width)
+        self.ones = [total + count for total, count in zip(self.ones, other.ones)]
+        self.num_rows += other.num_rows
+
+    def rates(self) -> Tuple[int, int]:
+        """Returns gamma and epsilon rates, in that order"""
+        return _rates_from_counts(self.ones, self.num_rows)
+
+    def power_consumption(self) -> int:
+        gamma_rate, epsilon_rate = self.rates()
+        return gamma_rate * epsilon_rate
+
+    def _set_width(self, width: int) -> None:
+        if self.width is None:
+            self.width = width
+            self.ones = [0] * width
+        elif width != self.width:
+            raise ValueError(f"expected rows of width {self.width}, got {width}")
+
+
+def _count_column_ones(bits: AnyStr, width: int) -> List[int]:
+    one = b"1" if isinstance(bits, bytes) else "1"
+    return [bits[col_num::width].count(one) for col_num in range(width)]
+
+
+def _rates_from_counts(ones: Sequence[int], num_rows: int) -> Tuple[int, int]:
+    """Ties count as a most common bit of 1, as in `determine_most_common`"""
+    gamma_rate = 0
+    for count in ones:
+        gamma_rate = (gamma_rate << 1) | (2 * count >= num_rows)
+    epsilon_rate = ~gamma_rate & ((1 << len(ones)) - 1)
+    return gamma_rate, epsilon_rate
+
+
+class RatingIndex:
+    """Sorted integer rows of a report for repeated rating searches.
+
+    Rows sharing a prefix are contiguous once sorted, so each bit criterion is
+    a bisect inside the current range and a rating costs O(bits * log n).
+    """
+
+    def __init__(self, values: Iterable[int], width: int) -> None:
+        self.values = sorted(values)
+        self.width = width
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[str]) -> RatingIndex:
+        rows = [row.strip() for row in rows if row.strip()]
+        width = max(map(len, rows), default=0)
+        return cls([int(row, 2) for row in rows], width)
+
+    def rating(self, rating_type: Literal["oxygen", "co2"], prefix: str = "") -> int:
+        """Rating of the rows starting with `prefix`, which is all rows by default"""
+        shift = self.width - len(prefix)
+        prefix_value = int(prefix, 2) if prefix else 0
+        lo = bisect_left(self.values, prefix_value << shift)
+        hi = bisect_left(self.values, (prefix_value + 1) << shift)
+        if lo == hi:
+            raise ValueError(f"no rows start with {prefix!r}")
+
+        for bit in range(shift - 1, -1, -1):
+            if hi - lo == 1:
+                break
+            split = bisect_left(
+                self.values, (prefix_value << (bit + 1)) | (1 << bit), lo, hi
+            )
+            zeros, ones = split - lo, hi - split
+            if rating_type == "oxygen":
+                keep_ones = ones >= zeros
+            else:
+                keep_ones = ones < zeros
+            if (ones if keep_ones else zeros) == 0:
+                keep_ones = not keep_ones
+
+            prefix_value = (prefix_value << 1) | keep_ones
+            if keep_ones:
+                lo = split
+            else:
+                hi = split
+        return self.values[lo]
+
+    def life_support_rating(self, prefix: str = "") -> int:
+        return self.rating("oxygen", prefix) * self.rating("co2", prefix)
+
+
 assert solve_puzzle_1(TEST_DATA) == 198
 assert solve_puzzle_2(TEST_DATA) == 230
+assert DiagnosticReport.from_rows(TEST_DATA).power_consumption() == 198
+assert RatingIndex.from_rows(TEST_DATA).life_support_rating() == 230
+
+
+def test_bit_count_accumulator():
+    first, second = BitCountAccumulator(), BitCountAccumulator()
+    first.update(TEST_DATA[:5])
+    for row in TEST_DATA[5:]:
+        second.add(row.encode())
+    first.merge(second)
+    assert first.power_consumption() == 198
+
+
+test_bit_count_accumulator()
 
 
 if __name__ == "__main__":
@@ -65,9 +65,15 @@ Figure out which board will win last. Once it wins, what would its final score b
 """
 from __future__ import annotations
 
+import os
+import random
 import re
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 INPUT_PATH = Path(__file__).parent / "data/day_04.txt"
 
@@ -104,6 +110,13 @@ class BingoBoard:
         self.cols_filled = [[False for i in range(self.side)] for i in range(self.side)]
         self.winning_num: Optional[int] = None
 
+    def reset(self) -> None:
+        for row_num in range(self.side):
+            for col_num in range(self.side):
+                self.rows_filled[row_num][col_num] = False
+                self.cols_filled[row_num][col_num] = False
+        self.winning_num = None
+
     def play_num(self, num: int):
 
         for row_num, row in enumerate(self.rows):
@@ -118,6 +131,17 @@ class BingoBoard:
 
         return is_bingo
 
+    def mark(self, row_num: int, col_num: int, num: int) -> bool:
+        """Marks a single cell and checks only its row and col for a bingo"""
+        self.rows_filled[row_num][col_num] = True
+        self.cols_filled[col_num][row_num] = True
+
+        is_bingo = all(self.rows_filled[row_num]) or all(self.cols_filled[col_num])
+        if is_bingo:
+            self.winning_num = num
+
+        return is_bingo
+
     def is_bingo(self) -> bool:
         """Checks row and col of move to see if it makes a bingo"""
         return any([all(row) for row in self.rows_filled]) or any(
@@ -166,6 +190,172 @@ class BingoBoard:
         return hash(self.get_board_no_state())
 
 
+class BitBoard:
+    """An N x N bingo board whose marks are the bits of a single int.
+
+    Cell `row * side + col` is bit `row * side + col`, and the row and column
+    masks for each size are computed once, so a win check is an AND and a
+    compare per line.
+    """
+
+    def __init__(self, rows: List[List[int]]) -> None:
+        self.side = len(rows)
+        if any(len(row) != self.side for row in rows):
+            raise ValueError(f"board must be square, got {rows}")
+
+        self.nums = [num for row in rows for num in row]
+        self.cells = defaultdict(list)
+        for cell, num in enumerate(self.nums):
+            self.cells[num].append(cell)
+        self.row_masks, self.col_masks = _win_masks(self.side)
+        self.marks = 0
+        self.winning_num: Optional[int] = None
+
+    @property
+    def rows(self) -> List[List[int]]:
+        return [
+            self.nums[row_start : row_start + self.side]
+            for row_start in range(0, len(self.nums), self.side)
+        ]
+
+    def reset(self) -> None:
+        self.marks = 0
+        self.winning_num = None
+
+    def play_num(self, num: int) -> bool:
+        for cell in self.cells.get(num, ()):
+            self.mark(*divmod(cell, self.side), num)
+        return self.winning_num is not None
+
+    def mark(self, row_num: int, col_num: int, num: int) -> bool:
+        """Marks a single cell and checks only its row and col for a bingo"""
+        self.marks |= 1 << (row_num * self.side + col_num)
+        row_mask = self.row_masks[row_num]
+        col_mask = self.col_masks[col_num]
+        is_bingo = (self.marks & row_mask) == row_mask or (
+            self.marks & col_mask
+        ) == col_mask
+        if is_bingo and self.winning_num is None:
+            self.winning_num = num
+
+        return is_bingo
+
+    def is_bingo(self) -> bool:
+        return any(
+            (self.marks & mask) == mask for mask in self.row_masks + self.col_masks
+        )
+
+    def get_score(self):
+        if self.winning_num is None:
+            return None
+
+        unmarked_numbers_sum = sum(
+            num for cell, num in enumerate(self.nums) if not self.marks >> cell & 1
+        )
+        return unmarked_numbers_sum * self.winning_num
+
+    @classmethod
+    def from_strings(cls, strings: List[str]) -> BitBoard:
+        return cls([list(map(int, string.split())) for string in strings])
+
+    def __repr__(self) -> str:
+        wraps = {True: " ", False: "_"}
+        row_strs = []
+        for row_num, row in enumerate(self.rows):
+            row_str = ""
+            for col_num, val in enumerate(row):
+                wrap = wraps[bool(self.marks >> (row_num * self.side + col_num) & 1)]
+                row_str += wrap + f"{val:02d}" + wrap + " "
+            row_strs.append(row_str.rstrip(" "))
+        return "\n".join(row_strs)
+
+
+@lru_cache(maxsize=None)
+def _win_masks(side: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Returns the row masks and col masks for a board of the given side"""
+    row_masks = tuple(((1 << side) - 1) << (row * side) for row in range(side))
+    col_mask = sum(1 << (row * side) for row in range(side))
+    col_masks = tuple(col_mask << col for col in range(side))
+    return row_masks, col_masks
+
+
+class BoardSet:
+    """Many N x N boards in one flat int array, with a parallel bit array of marks.
+
+    Board `b` occupies `nums[b * side * side : (b + 1) * side * side]` in
+    row-major order. Marks per row and col are counted, so a win is detected
+    when a count reaches `side`. A board is no longer marked once it has won,
+    so its score stays as it was at its winning draw.
+    """
+
+    def __init__(self, nums: Iterable[int], side: int) -> None:
+        self.nums = array("q", nums)
+        self.side = side
+        self.board_size = side * side
+        if len(self.nums) % self.board_size:
+            raise ValueError(
+                f"{len(self.nums)} numbers do not fill {side}x{side} boards"
+            )
+
+        self.cells = defaultdict(list)
+        for pos, num in enumerate(self.nums):
+            self.cells[num].append(pos)
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self.nums) // self.board_size
+
+    def reset(self) -> None:
+        self.marks = bytearray((len(self.nums) + 7) // 8)
+        self.line_counts = array("l", [0]) * (len(self) * 2 * self.side)
+        self.winning_nums: List[Optional[int]] = [None] * len(self)
+
+    def play_num(self, num: int) -> List[int]:
+        """Marks `num` on every board and returns the boards it made win"""
+        winners = []
+        for pos in self.cells.get(num, ()):
+            board_num, cell = divmod(pos, self.board_size)
+            if self.winning_nums[board_num] is not None or self.is_marked(pos):
+                continue
+
+            self.marks[pos >> 3] |= 1 << (pos & 7)
+            row_num, col_num = divmod(cell, self.side)
+            row_line = board_num * 2 * self.side + row_num
+            col_line = row_line - row_num + self.side + col_num
+            self.line_counts[row_line] += 1
+            self.line_counts[col_line] += 1
+            if self.side in (self.line_counts[row_line], self.line_counts[col_line]):
+                self.winning_nums[board_num] = num
+                winners.append(board_num)
+        return winners
+
+    def is_marked(self, pos: int) -> bool:
+        return bool(self.marks[pos >> 3] >> (pos & 7) & 1)
+
+    def is_bingo(self, board_num: int) -> bool:
+        return self.winning_nums[board_num] is not None
+
+    def get_score(self, board_num: int) -> Optional[int]:
+        winning_num = self.winning_nums[board_num]
+        if winning_num is None:
+            return None
+
+        start = board_num * self.board_size
+        unmarked_numbers_sum = sum(
+            self.nums[pos]
+            for pos in range(start, start + self.board_size)
+            if not self.is_marked(pos)
+        )
+        return unmarked_numbers_sum * winning_num
+
+    def get_rows(self, board_num: int) -> List[List[int]]:
+        start = board_num * self.board_size
+        return [
+            self.nums[row_start : row_start + self.side].tolist()
+            for row_start in range(start, start + self.board_size, self.side)
+        ]
+
+
 def parse_input(path: Path = INPUT_PATH) -> Tuple[List[int], List[BingoBoard]]:
     with open(path) as f:
         data = f.readlines()
@@ -184,6 +374,47 @@ def _parse_strings(data: List[str]) -> Tuple[List[int], Set[BingoBoard]]:
     return nums, boards
 
 
+def parse_grids(data: List[str]) -> Tuple[List[int], List[List[List[int]]]]:
+    """Parses boards of any size, separated by blank lines, keeping duplicates"""
+    nums = list(map(int, data[0].replace("\n", "").split(",")))
+
+    grids = []
+    rows = []
+    for line in data[1:] + [""]:
+        if line.strip():
+            rows.append(list(map(int, line.split())))
+        elif rows:
+            grids.append(rows)
+            rows = []
+    return nums, grids
+
+
+def parse_bitboards(data: List[str]) -> Tuple[List[int], List[BitBoard]]:
+    nums, grids = parse_grids(data)
+    return nums, [BitBoard(grid) for grid in grids]
+
+
+def parse_board_set(data: List[str]) -> Tuple[List[int], BoardSet]:
+    """Parses all boards with a single split, keeping duplicate boards"""
+    nums = list(map(int, data[0].replace("\n", "").split(",")))
+    side = len(next(line for line in data[1:] if line.strip()).split())
+    return nums, BoardSet(map(int, "\n".join(data[1:]).split()), side)
+
+
+def solve_board_set(
+    nums: List[int], board_set: BoardSet
+) -> Tuple[Optional[int], Optional[int]]:
+    """Returns the scores of the first and last boards to win, or None if none do"""
+    winners = []
+    for num in nums:
+        winners += board_set.play_num(num)
+        if len(winners) == len(board_set):
+            break
+    if not winners:
+        return None, None
+    return board_set.get_score(winners[0]), board_set.get_score(winners[-1])
+
+
 def solve_puzzle_1(nums: List[int], boards: Set[BingoBoard]) -> int:
     score = None
     for num in nums:
@@ -213,6 +444,138 @@ def solve_puzzle_2(nums: List[int], boards: Set[BingoBoard]) -> int:
     return ordered_boards[-1].get_score()
 
 
+CellIndex = Dict[int, List[Tuple[BingoBoard, int, int]]]
+
+
+def build_cell_index(boards: Iterable[BingoBoard]) -> CellIndex:
+    """Maps every number to the (board, row, col) cells that hold it"""
+    index = defaultdict(list)
+    for board in boards:
+        for row_num, row in enumerate(board.rows):
+            for col_num, board_num in enumerate(row):
+                index[board_num].append((board, row_num, col_num))
+    return dict(index)
+
+
+def iter_winners(
+    nums: Iterable[int], boards: Iterable[BingoBoard]
+) -> Iterator[BingoBoard]:
+    """Yields boards in the order they win, touching only cells that match a draw.
+
+    A board is no longer marked once it has won, so its score stays as it was
+    at its winning draw.
+    """
+    index = build_cell_index(boards)
+    for num in nums:
+        for board, row_num, col_num in index.get(num, ()):
+            if board.winning_num is None and board.mark(row_num, col_num, num):
+                yield board
+
+
+def win_turns(
+    nums: List[int], grids: Iterable[List[List[int]]]
+) -> List[Optional[int]]:
+    """Returns the draw index at which each board wins, or None if it never does.
+
+    With every cell replaced by the turn its number is drawn, a line is done
+    at the max turn of its cells and the board wins at the min over its lines.
+    """
+    ranks = _rank_draws(nums)
+    never = len(nums)
+
+    turns = []
+    for grid in grids:
+        cell_ranks = [[ranks.get(num, never) for num in row] for row in grid]
+        turn = min(min(map(max, cell_ranks)), min(map(max, zip(*cell_ranks))))
+        turns.append(None if turn == never else turn)
+    return turns
+
+
+def solve_puzzles_ranked(
+    nums: List[int], grids: Iterable[List[List[int]]]
+) -> Tuple[Optional[int], Optional[int]]:
+    """Returns the scores of the first and last boards to win, without playing.
+
+    Both scores are None if no board wins.
+    """
+    grids = list(grids)
+    winners = [
+        (turn, grid_num)
+        for grid_num, turn in enumerate(win_turns(nums, grids))
+        if turn is not None
+    ]
+    if not winners:
+        return None, None
+    first_turn, first_num = min(winners)
+    last_turn, last_num = max(winners, key=lambda winner: winner[0])
+
+    ranks = _rank_draws(nums)
+    return (
+        _score_grid(grids[first_num], nums, ranks, first_turn),
+        _score_grid(grids[last_num], nums, ranks, last_turn),
+    )
+
+
+def simulate_win_turns(
+    nums: List[int],
+    grids: Iterable[List[List[int]]],
+    num_games: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> List[Counter]:
+    """Plays `num_games` shuffles of `nums` on a process pool.
+
+    Game `g` draws in the order given by `random.Random(seed + g)`, so results
+    are reproducible for any number of workers. Returns, for every board, a
+    Counter of its win turns, with None counting the games it never won.
+    """
+    grids = list(grids)
+    workers = workers or os.cpu_count() or 1
+    bounds = [num_games * worker // workers for worker in range(workers + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            _simulate_games,
+            [nums] * workers,
+            [grids] * workers,
+            [seed + start for start in bounds[:-1]],
+            [stop - start for start, stop in zip(bounds, bounds[1:])],
+        )
+        distributions = [Counter() for _ in grids]
+        for partial in results:
+            for distribution, partial_distribution in zip(distributions, partial):
+                distribution.update(partial_distribution)
+    return distributions
+
+
+def _simulate_games(
+    nums: List[int], grids: List[List[List[int]]], seed: int, num_games: int
+) -> List[Counter]:
+    distributions = [Counter() for _ in grids]
+    order = list(nums)
+    for game in range(num_games):
+        order[:] = nums
+        random.Random(seed + game).shuffle(order)
+        for distribution, turn in zip(distributions, win_turns(order, grids)):
+            distribution[turn] += 1
+    return distributions
+
+
+def _score_grid(
+    grid: List[List[int]], nums: List[int], ranks: Dict[int, int], turn: int
+) -> int:
+    unmarked_numbers_sum = sum(
+        num for row in grid for num in row if ranks.get(num, turn + 1) > turn
+    )
+    return unmarked_numbers_sum * nums[turn]
+
+
+def _rank_draws(nums: List[int]) -> Dict[int, int]:
+    ranks = {}
+    for turn, num in enumerate(nums):
+        ranks.setdefault(num, turn)
+    return ranks
+
+
 def test_puzzle_1():
     expected_score = 4512
     nums, boards = _parse_strings(TEST_INPUT)
@@ -231,15 +594,74 @@ def test_puzzle_2():
     ), f"puzzle 2 failed with score {score}, expected {expected_score}"
 
 
+def test_iter_winners():
+    nums, boards = _parse_strings(TEST_INPUT)
+    winners = list(iter_winners(nums, boards))
+    assert len(winners) == len(boards)
+    assert winners[0].get_score() == 4512
+    assert winners[-1].get_score() == 1924
+
+
+def test_bitboards():
+    nums, boards = parse_bitboards(TEST_INPUT)
+    assert solve_puzzle_1(nums, boards) == 4512
+
+    nums, boards = parse_bitboards(TEST_INPUT)
+    assert solve_puzzle_2(nums, boards) == 1924
+
+    board = BitBoard([[row * 10 + col for col in range(10)] for row in range(10)])
+    assert not any(board.play_num(num) for num in range(3, 93, 10))
+    assert board.play_num(93)
+    assert board.get_score() == (sum(range(100)) - sum(range(3, 100, 10))) * 93
+
+
+def test_solve_puzzles_ranked():
+    nums, grids = parse_grids(TEST_INPUT)
+    assert win_turns(nums, grids) == [13, 14, 11]
+    assert solve_puzzles_ranked(nums, grids) == (4512, 1924)
+    assert solve_puzzles_ranked(nums[:4], grids) == (None, None)
+
+
+def test_simulated_games():
+    nums, grids = parse_grids(TEST_INPUT)
+    distributions = _simulate_games(nums, grids, seed=0, num_games=20)
+    assert all(sum(distribution.values()) == 20 for distribution in distributions)
+
+    boards = [BitBoard(grid) for grid in grids]
+    boards.append(BingoBoard.from_strings(TEST_INPUT[2:7]))
+    for board in boards:
+        for num in nums:
+            board.play_num(num)
+        board.reset()
+        assert not board.is_bingo() and board.get_score() is None
+
+
+def test_board_set():
+    nums, board_set = parse_board_set(TEST_INPUT + [""] + TEST_INPUT[2:7])
+    assert len(board_set) == 4
+    assert solve_board_set(nums, board_set) == (4512, 1924)
+
+    board_set.reset()
+    assert solve_board_set(nums[:4], board_set) == (None, None)
+
+    board_set.reset()
+    assert board_set.get_score(0) is None
+    assert board_set.get_rows(3) == board_set.get_rows(0)
+
+
 test_puzzle_1()
 test_puzzle_2()
+test_iter_winners()
+test_bitboards()
+test_solve_puzzles_ranked()
+test_simulated_games()
+test_board_set()
 
 
 if __name__ == "__main__":
-    nums, boards = parse_input(INPUT_PATH)
+    with open(INPUT_PATH) as f:
+        nums, grids = parse_grids(f.readlines())
 
-    score = solve_puzzle_1(nums, boards)
+    score, second_score = solve_puzzles_ranked(nums, grids)
     print(f"Answer for puzzle 1: {score}")
-
-    second_score = solve_puzzle_2(nums, boards)
     print(f"Answer for puzzle 2: {second_score}")
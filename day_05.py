@@ -61,10 +61,31 @@ You still need to determine the number of points where at least two lines overla
 
 Consider all of the lines. At how many points do at least two lines overlap?
 """
-
-from dataclasses import dataclass, field
+from __future__ import annotations
+
+import heapq
+import os
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import accumulate, chain, islice
+from operator import add
 from pathlib import Path
-from typing import Counter, Iterable, Literal, Tuple
+from typing import (
+    Callable,
+    Counter,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+)
 
 
 TEST_INPUT = """0,9 -> 5,9
@@ -87,8 +108,26 @@ INPUT_PATH = Path(__file__).parent / "data/day_05.txt"
 LineType = Literal["horizontal", "vertical", "diagonal"]
 
 
+# Points are encoded as the single int x * POINT_WIDTH + y + Y_OFFSET, so y
+# must lie in [-Y_OFFSET, Y_OFFSET)
+POINT_WIDTH = 1 << 32
+Y_OFFSET = POINT_WIDTH // 2
+
+
+def encode_point(x: int, y: int) -> int:
+    if not -Y_OFFSET <= y < Y_OFFSET:
+        raise ValueError(f"y={y} is outside the encodable range")
+    return x * POINT_WIDTH + y + Y_OFFSET
+
+
+def decode_point(code: int) -> Tuple[int, int]:
+    x, y = divmod(code, POINT_WIDTH)
+    return x, y - Y_OFFSET
+
+
 @dataclass
 class Point:
+    __slots__ = ("x", "y")
     x: int
     y: int
 
@@ -96,76 +135,83 @@ class Point:
         return f"Point: x={self.x}, y={self.y}"
 
     def __hash__(self) -> int:
-        return hash(self.__repr__())
+        return hash((self.x, self.y))
+
+    @property
+    def code(self) -> int:
+        return encode_point(self.x, self.y)
+
+    @classmethod
+    def from_code(cls, code: int) -> Point:
+        return cls(*decode_point(code))
 
 
-@dataclass
 class Line:
-    start: Point
-    end: Point
-    line_type: LineType = field(init=False)
-    crossing_points: Tuple[Point] = field(init=False)
+    """A segment stored as its two encoded end points.
+
+    The points a line covers are never stored: `point_codes` is a `range` over
+    the encoded points and `crossing_points` builds `Point`s on demand.
+    """
 
-    def __post_init__(self):
+    __slots__ = ("start_code", "end_code", "line_type")
+
+    def __init__(self, start: Point, end: Point) -> None:
+        self.start_code = start.code
+        self.end_code = end.code
         self.line_type = self._identify_line_type()
-        self.crossing_points = self._get_crossing_points()
+
+    @property
+    def start(self) -> Point:
+        return Point.from_code(self.start_code)
+
+    @property
+    def end(self) -> Point:
+        return Point.from_code(self.end_code)
+
+    @property
+    def crossing_points(self) -> Tuple[Point]:
+        return tuple(map(Point.from_code, self.point_codes()[1:-1]))
 
     def _identify_line_type(self) -> LineType:
-        if self.start.x == self.end.x:
+        start_x, start_y = decode_point(self.start_code)
+        end_x, end_y = decode_point(self.end_code)
+        if start_x == end_x:
             return "vertical"
-        elif self.start.y == self.end.y:
+        elif start_y == end_y:
             return "horizontal"
         else:
             return "diagonal"
 
-    def _get_crossing_points(self) -> Tuple[Point]:
-        if self.end.x >= self.start.x:
-            starting_x = self.start.x
-            ending_x = self.end.x
-            reverse_x = False
-        elif self.end.x < self.start.x:
-            starting_x = self.end.x
-            ending_x = self.start.x
-            reverse_x = True
-        if self.end.y >= self.start.y:
-            starting_y = self.start.y
-            ending_y = self.end.y
-            reverse_y = False
-        elif self.end.y < self.start.y:
-            starting_y = self.end.y
-            ending_y = self.start.y
-            reverse_y = True
-        base_x_iterator = range(starting_x + 1, ending_x)
-        base_y_iterator = range(starting_y + 1, ending_y)
-        if reverse_x:
-            x_iterator = reversed(base_x_iterator)
-        else:
-            x_iterator = base_x_iterator
-        if reverse_y:
-            y_iterator = reversed(base_y_iterator)
-        else:
-            y_iterator = base_y_iterator
-        if self.line_type == "horizontal":
-            points = tuple([Point(x, self.start.y) for x in x_iterator])
-            return points
-        elif self.line_type == "vertical":
-            points = tuple([Point(self.start.x, y) for y in y_iterator])
-            if reverse_y:
-                points = tuple(reversed(points))
-            return points
-        elif self.line_type == "diagonal":
-            return tuple(
-                [
-                    Point(x, y)
-                    for x, y in zip(
-                        x_iterator,
-                        y_iterator,
-                    )
-                ]
-            )
+    def point_codes(self) -> range:
+        """Encoded points from start to end, both included"""
+        return _point_codes(self.start_code, self.end_code)
+
+    def iter_points(self) -> Iterator[Point]:
+        return map(Point.from_code, self.point_codes())
 
     def get_all_points(self):
-        return tuple([self.start]) + self.crossing_points + tuple([self.end])
+        return tuple(self.iter_points())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Line):
+            return NotImplemented
+        return (self.start_code, self.end_code) == (other.start_code, other.end_code)
+
+    def __hash__(self) -> int:
+        return hash((self.start_code, self.end_code))
+
+    def __repr__(self) -> str:
+        return f"Line(start={self.start}, end={self.end}, line_type={self.line_type!r})"
+
+
+def _point_codes(start_code: int, end_code: int) -> range:
+    start_x, start_y = decode_point(start_code)
+    end_x, end_y = decode_point(end_code)
+    length = max(abs(end_x - start_x), abs(end_y - start_y))
+    if length == 0:
+        return range(start_code, start_code + 1)
+    step = (end_code - start_code) // length
+    return range(start_code, end_code + step, step)
 
 
 def parse_line(line: str):
@@ -188,13 +234,10 @@ def parse_input() -> Tuple[Line]:
 
 
 def solve_puzzles(lines: Tuple[Line], include_diagonals: bool = False):
-    points = tuple()
     if not include_diagonals:
         lines = tuple(filter(lambda x: x.line_type != "diagonal", lines))
-    for line in lines:
-        points += line.get_all_points()
-    counter = Counter(points)
-    num_greater_than_2 = len(list(filter(lambda x: x[1] >= 2, counter.items())))
+    counter = Counter(chain.from_iterable(line.point_codes() for line in lines))
+    num_greater_than_2 = sum(1 for count in counter.values() if count >= 2)
     return num_greater_than_2
 
 
@@ -206,6 +249,473 @@ def solve_puzzle_2(lines: Tuple[Line]):
     return solve_puzzles(lines, True)
 
 
+def count_overlaps_dense(lines: Iterable[Line], include_diagonals: bool = False) -> int:
+    """Counts overlaps by rasterizing difference arrays into a dense grid.
+
+    Each segment only adds a +1 and a -1 to a difference array for its
+    orientation. The grid is then swept one row at a time: horizontal counts
+    are a running sum along the row, vertical ones a running sum down the
+    columns and diagonal ones the previous row shifted by one. All per-cell
+    work happens in C-level `map`/`accumulate` calls.
+    """
+    horizontal_diffs = defaultdict(list)
+    vertical_diffs = defaultdict(list)
+    right_diffs = defaultdict(list)
+    left_diffs = defaultdict(list)
+
+    width = height = 0
+    for line in lines:
+        if line.line_type == "diagonal" and not include_diagonals:
+            continue
+        x1, y1, x2, y2 = line.start.x, line.start.y, line.end.x, line.end.y
+        if min(x1, y1, x2, y2) < 0:
+            raise ValueError(f"the dense grid starts at 0,0, got {line}")
+        if (y1, x1) > (y2, x2):
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        width = max(width, x1 + 1, x2 + 1)
+        height = max(height, y2 + 1)
+
+        # Columns are padded by one on each side so x - 1 and x + 1 always exist
+        if line.line_type == "horizontal":
+            horizontal_diffs[y1] += [(x1 + 1, 1), (x2 + 2, -1)]
+        elif line.line_type == "vertical":
+            vertical_diffs[y1].append((x1 + 1, 1))
+            vertical_diffs[y2 + 1].append((x1 + 1, -1))
+        elif x2 > x1:
+            right_diffs[y1].append((x1 + 1, 1))
+            right_diffs[y2 + 1].append((x2 + 2, -1))
+        else:
+            left_diffs[y1].append((x1 + 1, 1))
+            left_diffs[y2 + 1].append((x2, -1))
+
+    zeros = [0] * (width + 2)
+    vertical = right = left = zeros
+    num_greater_than_2 = 0
+    for y in range(height):
+        horizontal = list(accumulate(_apply_diffs(zeros, horizontal_diffs.get(y))))
+        vertical = _apply_diffs(vertical, vertical_diffs.get(y))
+        right = _apply_diffs([0] + right[:-1], right_diffs.get(y))
+        left = _apply_diffs(left[1:] + [0], left_diffs.get(y))
+        coverage = map(add, map(add, horizontal, vertical), map(add, right, left))
+        num_greater_than_2 += sum(map((2).__le__, coverage))
+    return num_greater_than_2
+
+
+def _apply_diffs(row: List[int], diffs: Optional[List[Tuple[int, int]]]) -> List[int]:
+    if not diffs:
+        return row
+    row = list(row)
+    for col_num, diff in diffs:
+        row[col_num] += diff
+    return row
+
+
+Segment = Tuple[int, int, int]  # constant, first and last parameter of a family
+
+# Every segment lies on a line of one family, given by the (constant, parameter)
+# of a point: horizontals keep y and run along x, and so on.
+_FAMILY_COORDS: Dict[str, Callable[[int, int], Tuple[int, int]]] = {
+    "horizontal": lambda x, y: (y, x),
+    "vertical": lambda x, y: (x, y),
+    "diagonal_down": lambda x, y: (x - y, x),
+    "diagonal_up": lambda x, y: (x + y, x),
+}
+
+# For each pair of families, a shear of the plane that makes the first family
+# horizontal and the second vertical, as (constant, low, high) segments in the
+# sheared plane, and the map from a sheared crossing back to (x, y). Diagonals
+# only cross on the lattice when their constants have the same parity.
+_FAMILY_CROSSINGS = [
+    (
+        "horizontal",
+        "vertical",
+        lambda c, a, b: (c, a, b),
+        lambda c, a, b: (c, a, b),
+        lambda u, v: (u, v),
+    ),
+    (
+        "horizontal",
+        "diagonal_down",
+        lambda c, a, b: (c, a - c, b - c),
+        lambda c, a, b: (c, a - c, b - c),
+        lambda u, v: (u + v, v),
+    ),
+    (
+        "horizontal",
+        "diagonal_up",
+        lambda c, a, b: (c, a + c, b + c),
+        lambda c, a, b: (c, c - b, c - a),
+        lambda u, v: (u - v, v),
+    ),
+    (
+        "vertical",
+        "diagonal_down",
+        lambda c, a, b: (c, c - b, c - a),
+        lambda c, a, b: (c, a, b),
+        lambda u, v: (v, v - u),
+    ),
+    (
+        "vertical",
+        "diagonal_up",
+        lambda c, a, b: (c, c + a, c + b),
+        lambda c, a, b: (c, a, b),
+        lambda u, v: (v, u - v),
+    ),
+    (
+        "diagonal_down",
+        "diagonal_up",
+        lambda c, a, b: (c, 2 * a - c, 2 * b - c),
+        lambda c, a, b: (c, 2 * a - c, 2 * b - c),
+        lambda u, v: ((u + v) // 2, (u - v) // 2),
+    ),
+]
+
+
+def count_overlaps_analytic(
+    lines: Iterable[Line], include_diagonals: bool = False
+) -> int:
+    """Counts overlaps from segment endpoints alone, without visiting points.
+
+    Points covered twice are either inside a collinear overlap, found with an
+    interval sweep per line, or a crossing of two families, found with a
+    sweep-line pass per pair of families. Crossings are deduplicated in a set
+    and removed from the collinear totals so no point is counted twice.
+    """
+    families = _group_by_family(lines, include_diagonals)
+    overlaps = {
+        family: {
+            constant: _collinear_overlaps(intervals)
+            for constant, intervals in constants.items()
+        }
+        for family, constants in families.items()
+    }
+
+    crossings = _find_crossings(families)
+    num_greater_than_2 = len(crossings)
+    for family, constants in overlaps.items():
+        coords = _FAMILY_COORDS[family]
+        for intervals in constants.values():
+            num_greater_than_2 += sum(high - low + 1 for low, high in intervals)
+        for x, y in crossings:
+            constant, param = coords(x, y)
+            num = bisect_right(constants.get(constant, ()), (param, float("inf")))
+            if num and constants[constant][num - 1][1] >= param:
+                num_greater_than_2 -= 1
+    return num_greater_than_2
+
+
+def _group_by_family(
+    lines: Iterable[Line], include_diagonals: bool
+) -> Dict[str, Dict[int, List[Tuple[int, int]]]]:
+    families = defaultdict(lambda: defaultdict(list))
+    for line in lines:
+        if line.line_type == "diagonal":
+            if not include_diagonals:
+                continue
+            slope = (line.end.x - line.start.x) * (line.end.y - line.start.y)
+            family = "diagonal_down" if slope > 0 else "diagonal_up"
+        else:
+            family = line.line_type
+        constant, start = _FAMILY_COORDS[family](line.start.x, line.start.y)
+        _, end = _FAMILY_COORDS[family](line.end.x, line.end.y)
+        families[family][constant].append((min(start, end), max(start, end)))
+    return families
+
+
+def _collinear_overlaps(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Returns the sorted, disjoint ranges covered by at least two intervals"""
+    events = sorted(
+        [(low, 1) for low, _ in intervals] + [(high + 1, -1) for _, high in intervals]
+    )
+    overlaps = []
+    coverage = 0
+    for param, change in events:
+        if coverage < 2 <= coverage + change:
+            overlap_start = param
+        elif coverage + change < 2 <= coverage and param > overlap_start:
+            overlaps.append((overlap_start, param - 1))
+        coverage += change
+    return overlaps
+
+
+def _find_crossings(
+    families: Dict[str, Dict[int, List[Tuple[int, int]]]]
+) -> Set[Tuple[int, int]]:
+    crossings = set()
+    for first, second, shear_first, shear_second, unshear in _FAMILY_CROSSINGS:
+        if first not in families or second not in families:
+            continue
+        lattice_parity = first.startswith("diagonal") and second.startswith("diagonal")
+        for parity in (0, 1) if lattice_parity else (None,):
+            horizontals = [
+                shear_first(constant, low, high)
+                for constant, intervals in families[first].items()
+                if parity is None or constant % 2 == parity
+                for low, high in intervals
+            ]
+            verticals = [
+                shear_second(constant, low, high)
+                for constant, intervals in families[second].items()
+                if parity is None or constant % 2 == parity
+                for low, high in intervals
+            ]
+            crossings.update(
+                unshear(u, v) for u, v in _sweep_crossings(horizontals, verticals)
+            )
+    return crossings
+
+
+def _sweep_crossings(
+    horizontals: List[Segment], verticals: List[Segment]
+) -> Iterator[Tuple[int, int]]:
+    """Yields (u, v) for every horizontal v = c crossing a vertical u = c.
+
+    Horizontals are active while the sweep is between their ends, kept sorted
+    by v, and each vertical reports the active ones inside its v range.
+    """
+    events = sorted(
+        [(low, 0, constant, 0) for constant, low, _ in horizontals]
+        + [(constant, 1, low, high) for constant, low, high in verticals]
+        + [(high, 2, constant, 0) for constant, _, high in horizontals]
+    )
+    active: List[int] = []
+    for u, kind, low, high in events:
+        if kind == 0:
+            insort(active, low)
+        elif kind == 2:
+            del active[bisect_left(active, low)]
+        else:
+            for num in range(bisect_left(active, low), bisect_right(active, high)):
+                yield u, active[num]
+
+
+# An array slot, plus the list entry and int object `sorted` creates per code
+_SORT_BYTES_PER_CODE = 48
+# Run files read at once by one merge, and the fewest codes read per file access
+_MERGE_FAN_IN = 64
+_MIN_BLOCK_SIZE = 1 << 12
+
+
+def count_overlaps_external(
+    lines: Iterable[Line],
+    include_diagonals: bool = False,
+    max_memory: int = 256 << 20,
+    tmp_dir: Optional[Path] = None,
+    fan_in: int = _MERGE_FAN_IN,
+) -> int:
+    """Counts overlaps with at most about `max_memory` bytes of points in memory.
+
+    Encoded points are buffered until the budget is reached, then sorted and
+    spilled to a run file in `tmp_dir`. Groups of at most `fan_in` runs are
+    merged into longer runs until `fan_in` or fewer are left, which are k-way
+    merged while codes seen at least twice in a row are counted.
+    """
+    if fan_in < 2:
+        raise ValueError(f"fan_in must be at least 2, got {fan_in}")
+    buffer_size = max(1, max_memory // _SORT_BYTES_PER_CODE)
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+        run_dir = Path(run_dir)
+        run_paths = []
+        buffer = array("q")
+        for line in lines:
+            if line.line_type == "diagonal" and not include_diagonals:
+                continue
+            codes = line.point_codes()
+            while codes:
+                free = buffer_size - len(buffer)
+                buffer.extend(codes[:free])
+                codes = codes[free:]
+                if len(buffer) == buffer_size:
+                    run_paths.append(_spill_run(buffer, run_dir, len(run_paths)))
+                    buffer = array("q")
+
+        if not run_paths:
+            return _count_repeats(sorted(buffer))
+        if buffer:
+            run_paths.append(_spill_run(buffer, run_dir, len(run_paths)))
+        block_size = max(_MIN_BLOCK_SIZE, buffer_size // fan_in)
+        level = 0
+        while len(run_paths) > fan_in:
+            level += 1
+            run_paths = [
+                _merge_runs(
+                    run_paths[start : start + fan_in],
+                    run_dir / f"merge_{level:02d}_{start // fan_in:06d}.bin",
+                    block_size,
+                )
+                for start in range(0, len(run_paths), fan_in)
+            ]
+        runs = [_read_run(run_path, block_size) for run_path in run_paths]
+        return _count_repeats(heapq.merge(*runs))
+
+
+def _spill_run(codes: array, run_dir: Path, run_num: int) -> Path:
+    run_path = run_dir / f"run_{run_num:06d}.bin"
+    with open(run_path, "wb") as f:
+        array("q", sorted(codes)).tofile(f)
+    return run_path
+
+
+def _merge_runs(run_paths: List[Path], merged_path: Path, block_size: int) -> Path:
+    merged = heapq.merge(*(_read_run(run_path, block_size) for run_path in run_paths))
+    with open(merged_path, "wb") as f:
+        while True:
+            block = array("q", islice(merged, block_size))
+            if not block:
+                break
+            block.tofile(f)
+    for run_path in run_paths:
+        run_path.unlink()
+    return merged_path
+
+
+def _read_run(run_path: Path, block_size: int) -> Iterator[int]:
+    with open(run_path, "rb") as f:
+        while True:
+            block = array("q")
+            try:
+                block.fromfile(f, block_size)
+            except EOFError:
+                yield from block
+                return
+            yield from block
+
+
+def _count_repeats(sorted_codes: Iterable[int]) -> int:
+    num_greater_than_2 = 0
+    previous = None
+    repeats = 0
+    for code in sorted_codes:
+        if code == previous:
+            repeats += 1
+            if repeats == 1:
+                num_greater_than_2 += 1
+        else:
+            previous = code
+            repeats = 0
+    return num_greater_than_2
+
+
+def count_overlaps_tiled(
+    lines: Iterable[Line],
+    include_diagonals: bool = False,
+    tile_size: int = 256,
+    workers: Optional[int] = None,
+) -> int:
+    """Counts overlaps tile by tile on a process pool.
+
+    The plane is cut into `tile_size` squares and every segment is clipped to
+    the tiles it passes through. Tiles share no points, so their overlap
+    counts, computed independently by the workers, simply add up.
+    """
+    tiles = defaultdict(list)
+    for line in lines:
+        if line.line_type == "diagonal" and not include_diagonals:
+            continue
+        for tile, piece in _clip_to_tiles(line, tile_size):
+            tiles[tile].append(piece)
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, len(tiles) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return sum(
+            executor.map(_count_tile_overlaps, tiles.values(), chunksize=chunk_size)
+        )
+
+
+def _clip_to_tiles(
+    line: Line, tile_size: int
+) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Yields each tile a line passes through with the encoded ends of its piece"""
+    start_x, start_y = decode_point(line.start_code)
+    end_x, end_y = decode_point(line.end_code)
+    step_x = (end_x > start_x) - (end_x < start_x)
+    step_y = (end_y > start_y) - (end_y < start_y)
+    length = max(abs(end_x - start_x), abs(end_y - start_y))
+
+    done = 0
+    while done <= length:
+        x, y = start_x + step_x * done, start_y + step_y * done
+        tile_x, tile_y = x // tile_size, y // tile_size
+        steps = length - done
+        for pos, step, tile in ((x, step_x, tile_x), (y, step_y, tile_y)):
+            if step > 0:
+                steps = min(steps, (tile + 1) * tile_size - 1 - pos)
+            elif step < 0:
+                steps = min(steps, pos - tile * tile_size)
+        piece_end = encode_point(x + step_x * steps, y + step_y * steps)
+        yield (tile_x, tile_y), (encode_point(x, y), piece_end)
+        done += steps + 1
+
+
+def _count_tile_overlaps(pieces: List[Tuple[int, int]]) -> int:
+    counter = Counter(chain.from_iterable(_point_codes(*piece) for piece in pieces))
+    return sum(1 for count in counter.values() if count >= 2)
+
+
+class VentIndex:
+    """Live per-point coverage counts for a changing set of lines.
+
+    Coverage is kept both for all lines and for horizontal and vertical lines
+    only, along with how many points each has covered at least twice, so
+    adding or removing a line costs its length and overlap counts are O(1).
+    """
+
+    def __init__(self, lines: Iterable[Line] = ()) -> None:
+        self.lines: Counter[Line] = Counter()
+        self.coverage: Dict[int, int] = {}
+        self.straight_coverage: Dict[int, int] = {}
+        self.num_overlaps = 0
+        self.num_straight_overlaps = 0
+        for line in lines:
+            self.add(line)
+
+    def __len__(self) -> int:
+        return sum(self.lines.values())
+
+    def __contains__(self, line: Line) -> bool:
+        return self.lines[line] > 0
+
+    def add(self, line: Line) -> None:
+        self.lines[line] += 1
+        self._update(line, 1)
+
+    def remove(self, line: Line) -> None:
+        if not self.lines[line]:
+            raise ValueError(f"{line} is not in the index")
+        self.lines[line] -= 1
+        if not self.lines[line]:
+            del self.lines[line]
+        self._update(line, -1)
+
+    def overlap_count(self, include_diagonals: bool = False) -> int:
+        if include_diagonals:
+            return self.num_overlaps
+        return self.num_straight_overlaps
+
+    def _update(self, line: Line, change: int) -> None:
+        codes = line.point_codes()
+        self.num_overlaps += _update_coverage(self.coverage, codes, change)
+        if line.line_type != "diagonal":
+            self.num_straight_overlaps += _update_coverage(
+                self.straight_coverage, codes, change
+            )
+
+
+def _update_coverage(coverage: Dict[int, int], codes: range, change: int) -> int:
+    """Applies `change` to every code and returns the change in overlaps"""
+    overlaps_change = 0
+    for code in codes:
+        count = coverage.get(code, 0) + change
+        if (count >= 2) != (count - change >= 2):
+            overlaps_change += change
+        if count:
+            coverage[code] = count
+        else:
+            del coverage[code]
+    return overlaps_change
+
+
 def test_puzzle_1():
     test_lines = parse_lines(TEST_INPUT)
     answer = solve_puzzle_1(test_lines)
@@ -218,8 +728,101 @@ def test_puzzle_2():
     assert answer == 12
 
 
+def test_count_overlaps_dense():
+    test_lines = parse_lines(TEST_INPUT)
+    assert count_overlaps_dense(test_lines) == 5
+    assert count_overlaps_dense(test_lines, include_diagonals=True) == 12
+
+
+def test_count_overlaps_analytic():
+    test_lines = parse_lines(TEST_INPUT)
+    assert count_overlaps_analytic(test_lines) == 5
+    assert count_overlaps_analytic(test_lines, include_diagonals=True) == 12
+
+    big_lines = parse_lines(["0,0 -> 9000000,9000000", "9000000,0 -> 0,9000000"])
+    assert count_overlaps_analytic(big_lines, include_diagonals=True) == 1
+
+
+def test_count_overlaps_external():
+    test_lines = parse_lines(TEST_INPUT)
+    tiny_budget = 4 * _SORT_BYTES_PER_CODE
+    assert count_overlaps_external(test_lines, max_memory=tiny_budget) == 5
+    assert count_overlaps_external(test_lines, True, max_memory=tiny_budget) == 12
+    assert count_overlaps_external(test_lines, True) == 12
+    # One code per run gives dozens of runs, merged over several levels
+    for fan_in in (2, 3, 64):
+        assert (
+            count_overlaps_external(
+                test_lines, True, max_memory=_SORT_BYTES_PER_CODE, fan_in=fan_in
+            )
+            == 12
+        )
+
+
+def test_clip_to_tiles():
+    test_lines = parse_lines(TEST_INPUT)
+    tiles = defaultdict(list)
+    for line in test_lines:
+        pieces = list(_clip_to_tiles(line, tile_size=3))
+        assert sum(len(_point_codes(*piece)) for _, piece in pieces) == len(
+            line.point_codes()
+        )
+        for tile, piece in pieces:
+            tiles[tile].append(piece)
+    assert sum(map(_count_tile_overlaps, tiles.values())) == 12
+
+
+def test_vent_index():
+    test_lines = parse_lines(TEST_INPUT)
+    index = VentIndex(test_lines)
+    assert index.overlap_count() == 5
+    assert index.overlap_count(include_diagonals=True) == 12
+
+    for line in test_lines[:5]:
+        index.remove(line)
+    assert index.overlap_count(include_diagonals=True) == solve_puzzle_2(
+        test_lines[5:]
+    )
+    for line in test_lines[:5]:
+        index.add(line)
+    assert index.overlap_count(include_diagonals=True) == 12
+
+
+def test_negative_coordinates():
+    line = Line(Point(2, -1), Point(2, 3))
+    assert (line.start, line.end) == (Point(2, -1), Point(2, 3))
+    assert line.line_type == "vertical"
+    assert len(line.point_codes()) == 5
+
+    test_lines = parse_lines(["0,-1 -> 0,1", "0,0 -> 0,2", "-3,-3 -> 1,1"])
+    assert solve_puzzle_1(test_lines) == 2
+    assert solve_puzzle_2(test_lines) == 2
+    assert count_overlaps_external(test_lines, True, max_memory=1) == 2
+    assert VentIndex(test_lines).overlap_count(include_diagonals=True) == 2
+    tiles = defaultdict(list)
+    for test_line in test_lines:
+        for tile, piece in _clip_to_tiles(test_line, tile_size=2):
+            tiles[tile].append(piece)
+    assert sum(map(_count_tile_overlaps, tiles.values())) == 2
+
+
+def test_zero_length_lines():
+    point_line = parse_line("3,3 -> 3,3")
+    assert point_line.get_all_points() == (Point(3, 3),)
+    assert point_line.crossing_points == ()
+    assert solve_puzzle_1((point_line,)) == 0
+    assert solve_puzzle_1((point_line, point_line)) == 1
+
+
 test_puzzle_1()
 test_puzzle_2()
+test_count_overlaps_dense()
+test_count_overlaps_analytic()
+test_count_overlaps_external()
+test_clip_to_tiles()
+test_vent_index()
+test_negative_coordinates()
+test_zero_length_lines()
 
 if __name__ == "__main__":
     data = parse_input()
@@ -56,9 +56,11 @@ After 256 days in the example above, there would be a total of 26984457539 lante
 
 How many lanternfish would there be after 256 days?
 """
-from collections import Counter
+from collections import Counter, deque
+from functools import lru_cache
+from operator import mul
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional, Sequence, Tuple
 
 INPUT_PATH = Path(__file__).parent / "data/day_06.txt"
 
@@ -71,13 +73,15 @@ def parse_input() -> List[int]:
     return list(map(int, data))
 
 
-def increment_one_day(beginning_state: Counter) -> Counter:
+def increment_one_day(
+    beginning_state: Counter, reset_timer: int = 6, newborn_timer: int = 8
+) -> Counter:
     final_state = Counter()
 
     for age, number in beginning_state.items():
         if age == 0:
-            final_state[6] += number
-            final_state[8] += number
+            final_state[reset_timer] += number
+            final_state[newborn_timer] += number
         else:
             final_state[age - 1] += number
 
@@ -91,6 +95,136 @@ def solve_puzzle(initial_state: List[int], days: int):
     return sum(current_state.values())
 
 
+def _timer_histogram(initial_state: List[int]) -> Counter:
+    histogram = Counter(initial_state)
+    invalid = sorted(age for age in histogram if not 0 <= age <= 8)
+    if invalid:
+        raise ValueError(f"timers must be between 0 and 8, got {invalid}")
+    return histogram
+
+
+def population_curve(initial_state: List[int], days: int) -> List[int]:
+    """Returns the population on every day from 0 to `days`, in one pass.
+
+    The nine timer buckets live in a fixed deque that is rotated in place:
+    rotating moves the fish at timer 0 to timer 8 as newborns, and the same
+    number is added back at timer 6 for their parents.
+    """
+    histogram = _timer_histogram(initial_state)
+    buckets = deque(histogram[age] for age in range(9))
+    population = sum(buckets)
+    curve = [population]
+    for _ in range(days):
+        buckets.rotate(-1)
+        buckets[6] += buckets[8]
+        population += buckets[8]
+        curve.append(population)
+    return curve
+
+
+def solve_puzzle_matrix(
+    initial_state: List[int], days: int, modulus: Optional[int] = None
+) -> int:
+    """Population after `days` from the timer transition matrix raised to `days`.
+
+    Repeated squaring needs O(log days) 9x9 products. Results are exact ints,
+    or reduced modulo `modulus` throughout when one is given.
+    """
+    histogram = _timer_histogram(initial_state)
+    populations = timer_populations(days, modulus)
+    population = sum(number * populations[age] for age, number in histogram.items())
+    return population % modulus if modulus else population
+
+
+def solve_schools(
+    schools: Iterable[List[int]], days: int, modulus: Optional[int] = None
+) -> List[int]:
+    """Populations of many schools after the same number of days.
+
+    The per-timer table for `days` is computed once, so each school costs a
+    histogram and a nine-term dot product.
+    """
+    return [solve_puzzle_matrix(school, days, modulus) for school in schools]
+
+
+@lru_cache(maxsize=256)
+def timer_populations(
+    days: int,
+    modulus: Optional[int] = None,
+    cycle_length: int = 7,
+    newborn_delay: int = 2,
+) -> Tuple[int, ...]:
+    """Population after `days` grown from a single fish of each timer value"""
+    if days < 0:
+        raise ValueError(f"days must not be negative, got {days}")
+    matrix = transition_matrix(cycle_length, newborn_delay)
+    power = _matrix_power(matrix, days, modulus)
+    return tuple(sum(column) for column in zip(*power))
+
+
+def sweep_lifecycles(
+    configs: Iterable[Tuple[int, int, Sequence[int]]],
+    days: int,
+    modulus: Optional[int] = None,
+) -> List[int]:
+    """Populations after `days` for many (cycle_length, newborn_delay, histogram).
+
+    `histogram[t]` is the number of fish starting with timer `t`. Configs that
+    share a lifecycle share one cached per-timer table, so the sweep costs one
+    matrix power per distinct lifecycle and a dot product per config.
+    """
+    populations = []
+    for cycle_length, newborn_delay, histogram in configs:
+        table = timer_populations(days, modulus, cycle_length, newborn_delay)
+        if len(histogram) > len(table):
+            raise ValueError(
+                f"histogram has {len(histogram)} timers, but a lifecycle of "
+                f"{cycle_length} + {newborn_delay} days only has {len(table)}"
+            )
+        population = sum(map(mul, histogram, table))
+        populations.append(population % modulus if modulus else population)
+    return populations
+
+
+Matrix = List[List[int]]
+
+
+def transition_matrix(cycle_length: int = 7, newborn_delay: int = 2) -> Matrix:
+    """Entry [new][old] is how many fish of timer `new` one of timer `old` becomes"""
+    if cycle_length < 1 or newborn_delay < 0:
+        raise ValueError(
+            f"need cycle_length >= 1 and newborn_delay >= 0, "
+            f"got {cycle_length} and {newborn_delay}"
+        )
+    num_timers = cycle_length + newborn_delay
+    matrix = [[0] * num_timers for _ in range(num_timers)]
+    for age in range(1, num_timers):
+        matrix[age - 1][age] = 1
+    matrix[cycle_length - 1][0] += 1
+    matrix[num_timers - 1][0] += 1
+    return matrix
+
+
+def _matrix_power(matrix: Matrix, power: int, modulus: Optional[int]) -> Matrix:
+    size = len(matrix)
+    result = [[int(row == col) for col in range(size)] for row in range(size)]
+    while power:
+        if power & 1:
+            result = _matrix_multiply(result, matrix, modulus)
+        power >>= 1
+        if power:
+            matrix = _matrix_multiply(matrix, matrix, modulus)
+    return result
+
+
+def _matrix_multiply(left: Matrix, right: Matrix, modulus: Optional[int]) -> Matrix:
+    columns = list(zip(*right))
+    product = [[sum(map(mul, row, column)) for column in columns] for row in left]
+    if modulus:
+        product = [[value % modulus for value in row] for row in product]
+    return product
+
+
 def test_puzzle():
     test_answer_1 = solve_puzzle(TEST_INPUT, 18)
     assert test_answer_1 == 26
@@ -102,7 +236,74 @@ def test_puzzle():
     assert test_answer_3 == 26984457539
 
 
+def test_puzzle_matrix():
+    for days in (0, 1, 18, 80, 256):
+        assert solve_puzzle_matrix(TEST_INPUT, days) == solve_puzzle(TEST_INPUT, days)
+
+    assert solve_puzzle_matrix(TEST_INPUT, 256, modulus=1_000_003) == (
+        26984457539 % 1_000_003
+    )
+
+
+def test_rejects_invalid_input():
+    cases = [
+        (solver, initial_state, 1)
+        for solver in (solve_puzzle_matrix, population_curve)
+        for initial_state in ([9, 3], [-1])
+    ]
+    cases.append((solve_puzzle_matrix, TEST_INPUT, -1))
+    for solver, initial_state, days in cases:
+        try:
+            solver(initial_state, days)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(
+                f"{solver.__name__} accepted timers {initial_state}, days {days}"
+            )
+
+
+def test_population_curve():
+    curve = population_curve(TEST_INPUT, 256)
+    assert len(curve) == 257
+    assert curve[0] == 5
+    assert curve[18] == 26
+    assert curve[80] == 5934
+    assert curve[256] == 26984457539
+
+
+def test_solve_schools():
+    schools = [TEST_INPUT, [0], [8, 8], []]
+    expected = [solve_puzzle(school, 80) for school in schools]
+    assert solve_schools(schools, 80) == expected
+    assert timer_populations(18)[3] == solve_puzzle([3], 18)
+
+
+def test_sweep_lifecycles():
+    histogram = [Counter(TEST_INPUT)[age] for age in range(9)]
+    configs = [(7, 2, histogram), (5, 3, [1, 0, 2]), (1, 0, [3])]
+    assert sweep_lifecycles(configs, 80) == [5934, 21415, 3 * 2**80]
+
+    state = Counter({0: 1, 2: 2})
+    for _ in range(80):
+        state = increment_one_day(state, reset_timer=4, newborn_timer=7)
+    assert sum(state.values()) == 21415
+
+    for cycle_length, newborn_delay in ((0, 2), (0, 0), (7, -1)):
+        try:
+            sweep_lifecycles([(cycle_length, newborn_delay, [1])], 5)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"accepted lifecycle {cycle_length}, {newborn_delay}")
+
+
 test_puzzle()
+test_puzzle_matrix()
+test_rejects_invalid_input()
+test_population_curve()
+test_solve_schools()
+test_sweep_lifecycles()
 
 if __name__ == "__main__":
     data = parse_input()
@@ -32,6 +32,7 @@ This costs a total of 37 fuel. This is the cheapest possible outcome; more expen
 Determine the horizontal position that the crabs can align to using the least fuel possible. How much fuel must they spend to align to that position?
 """
 
+import random
 from pathlib import Path
 from typing import Callable, List, Tuple
 
@@ -75,7 +76,53 @@ def puzzle_1_cost_function(val: int, position: int) -> int:
 
 
 def puzzle_2_cost_function(val: int, position: int) -> int:
-    return sum(range(1, abs(val - position) + 1))
+    distance = abs(val - position)
+    return distance * (distance + 1) // 2
+
+
+def solve_puzzle_1_closed_form(data: List[int]) -> Tuple[int, int]:
+    """Linear cost is minimised at the median, found by selection in O(n).
+
+    With an even number of crabs every position between the two middle ones
+    is optimal, and the lower one matches `solve_puzzle_1`.
+    """
+    position = _select(data, (len(data) - 1) // 2)
+    return position, compute_position_cost(data, position, puzzle_1_cost_function)
+
+
+def solve_puzzle_2_closed_form(data: List[int]) -> Tuple[int, int]:
+    """Triangular cost is minimised within half a step of the mean.
+
+    Only the integers around the mean are checked, each with the closed form
+    d * (d + 1) / 2, and ties go to the lowest position as in `solve_puzzle_2`.
+    """
+    mean_floor = sum(data) // len(data)
+    candidates = range(
+        max(min(data), mean_floor - 1), min(max(data), mean_floor + 2) + 1
+    )
+    costs = [
+        (compute_position_cost(data, position, puzzle_2_cost_function), position)
+        for position in candidates
+    ]
+    cost, position = min(costs)
+    return position, cost
+
+
+def _select(data: List[int], k: int) -> int:
+    """Returns the k-th smallest value (from 0) with quickselect"""
+    values = data
+    while True:
+        pivot = random.choice(values)
+        lows = [val for val in values if val < pivot]
+        if k < len(lows):
+            values = lows
+            continue
+
+        num_pivots = values.count(pivot)
+        if k < len(lows) + num_pivots:
+            return pivot
+        k -= len(lows) + num_pivots
+        values = [val for val in values if val > pivot]
 
 
 def test_puzzle_1():
@@ -88,8 +135,14 @@ def test_puzzle_2():
     assert answer == (5, 168)
 
 
+def test_closed_form():
+    assert solve_puzzle_1_closed_form(TEST_INPUT) == (2, 37)
+    assert solve_puzzle_2_closed_form(TEST_INPUT) == (5, 168)
+
+
 test_puzzle_1()
 test_puzzle_2()
+test_closed_form()
 
 if __name__ == "__main__":
     with open(INPUT_PATH) as f:
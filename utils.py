@@ -1,7 +1,34 @@
 from pathlib import Path
+from typing import Iterator, List, Tuple
 
 
 def get_input_path(file: str) -> Path:
 
     data_file = file.rstrip(".py") + ".txt"
     return Path(file).parent / f"data/{data_file}"
+
+
+def split_on_newlines(path: Path, n_chunks: int) -> List[Tuple[int, int]]:
+    """Splits a file into at most `n_chunks` byte ranges that start on a line"""
+    size = Path(path).stat().st_size
+    bounds = [0]
+    with open(path, "rb") as f:
+        for chunk_num in range(1, n_chunks):
+            f.seek(max(size * chunk_num // n_chunks, bounds[-1]))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def iter_chunk_lines(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Yields the non-blank lines in the byte range [start, end) of a file"""
+    remaining = end - start
+    with open(path, "rb") as f:
+        f.seek(start)
+        for line in f:
+            if line.strip():
+                yield line
+            remaining -= len(line)
+            if remaining <= 0:
+                break